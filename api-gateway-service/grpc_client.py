@@ -1,83 +1,155 @@
 import grpc
-from datetime import date, datetime
+import itertools
+from typing import AsyncIterator
 from google.protobuf.struct_pb2 import Struct
-from google.protobuf.json_format import MessageToDict
 from proto import ehr_service_pb2_grpc, ehr_service_pb2
 
-
-def serialize_dates(obj):
-    """Recursively serialize date and datetime objects to ISO format strings"""
-    if isinstance(obj, dict):
-        return {key: serialize_dates(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [serialize_dates(item) for item in obj]
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    elif isinstance(obj, date):
-        return obj.isoformat()
-    else:
-        return obj
+# Channel tuning: keepalive pings on idle calls, 16 MB message limits and no
+# client-side retry machinery on the internal link
+CHANNEL_OPTIONS = [
+    ('grpc.enable_retries', 0),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.keepalive_time_ms', 10000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.max_send_message_length', 16 * 1024 * 1024),
+    ('grpc.max_receive_message_length', 16 * 1024 * 1024),
+]
+
+# Extra BulkCreatePatients deadline per streamed record, on top of the call timeout
+BULK_CREATE_TIMEOUT_PER_RECORD = 0.05
+
+# Request message classes bound once at import time
+_CreatePatientRequest = ehr_service_pb2.CreatePatientRequest
+_GetPatientRequest = ehr_service_pb2.GetPatientRequest
+_GetAllPatientsRequest = ehr_service_pb2.GetAllPatientsRequest
+_SearchPatientByIdRequest = ehr_service_pb2.SearchPatientByIdRequest
+_UpdatePatientRequest = ehr_service_pb2.UpdatePatientRequest
+_DeletePatientRequest = ehr_service_pb2.DeletePatientRequest
 
 
 def dict_to_struct(data: dict) -> Struct:
-    """Convert Python dict to protobuf Struct, serializing dates first"""
-    # Serialize dates to strings
-    serialized_data = serialize_dates(data)
-
-    # Convert to Struct
+    """Convert JSON-safe Python dict to protobuf Struct"""
     struct = Struct()
-    struct.update(serialized_data)
+    struct.update(data)
     return struct
 
 
+def struct_to_dict(struct: Struct) -> dict:
+    """Convert protobuf Struct to Python dict by walking its fields directly"""
+    to_python = _value_to_python
+    return {key: to_python(value) for key, value in struct.fields.items()}
+
+
+def _value_to_python(value):
+    """Convert a protobuf Value to the matching Python object"""
+    kind = value.WhichOneof('kind')
+    if kind == 'string_value':
+        return value.string_value
+    if kind == 'struct_value':
+        return struct_to_dict(value.struct_value)
+    if kind == 'number_value':
+        return value.number_value
+    if kind == 'bool_value':
+        return value.bool_value
+    if kind == 'list_value':
+        return [_value_to_python(item) for item in value.list_value.values]
+    return None
+
+
+class ChannelPool:
+    """Fixed-size pool of gRPC channels picked in round-robin order"""
+
+    def __init__(self, target: str, size: int = 4):
+        """Open size channels to target, each on its own HTTP/2 connection"""
+        # A local subchannel pool keeps channels from sharing one connection
+        self._channels = [
+            grpc.aio.insecure_channel(
+                target,
+                options=CHANNEL_OPTIONS + [('grpc.use_local_subchannel_pool', 1)],
+                compression=grpc.Compression.Gzip
+            )
+            for _ in range(max(1, size))
+        ]
+        self._stubs = [ehr_service_pb2_grpc.EhrServiceStub(c) for c in self._channels]
+        self._next = itertools.count()
+
+    def pick(self) -> ehr_service_pb2_grpc.EhrServiceStub:
+        """Return the stub for the next channel in the pool"""
+        return self._stubs[next(self._next) % len(self._stubs)]
+
+    async def close(self):
+        """Close every channel in the pool"""
+        for channel in self._channels:
+            await channel.close()
+
+
 class GrpcClient:
     """gRPC client for EHR service"""
 
-    def __init__(self, host: str = 'localhost', port: int = 50051):
-        """Initialize gRPC client with server address"""
+    def __init__(self, host: str = 'localhost', port: int = 50051, pool_size: int = 4,
+                 timeout: float = 5.0, stream_timeout: float = 300.0):
+        """Initialize gRPC client with server address, channel pool size and call timeouts"""
         self.address = f'{host}:{port}'
-        self.channel = None
-        self.stub = None
+        self.pool_size = pool_size
+        self.timeout = timeout
+        # A server stream is drained at the pace of the HTTP client reading the
+        # response, so it gets its own, much longer deadline
+        self.stream_timeout = stream_timeout
+        self.pool = None
 
     async def __aenter__(self):
-        """Async context manager entry"""
-        self.channel = grpc.aio.insecure_channel(self.address)
-        self.stub = ehr_service_pb2_grpc.EhrServiceStub(self.channel)
+        """Async context manager entry - open the channel pool"""
+        self.pool = ChannelPool(self.address, self.pool_size)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.channel:
-            await self.channel.close()
+        """Async context manager exit - close the channel pool"""
+        await self.pool.close()
+        self.pool = None
+
+    def _stub(self):
+        """Pick the next stub from the channel pool"""
+        return self.pool.pick()
 
     async def create_patient(self, patient_data: dict) -> dict:
         """Create a new patient via gRPC"""
         # Convert dict to protobuf Struct
         patient_struct = dict_to_struct(patient_data)
 
-        request = ehr_service_pb2.CreatePatientRequest(
+        request = _CreatePatientRequest(
             patientData=patient_struct
         )
 
-        response = await self.stub.CreatePatient(request)
+        response = await self._stub().CreatePatient(request, timeout=self.timeout)
         return self._patient_proto_to_dict(response.patient)
 
+    async def bulk_create_patients(self, patients: list) -> dict:
+        """Create many patients over one client-streaming gRPC call"""
+        requests = (_CreatePatientRequest(patientData=dict_to_struct(p)) for p in patients)
+        timeout = self.timeout + len(patients) * BULK_CREATE_TIMEOUT_PER_RECORD
+        response = await self._stub().BulkCreatePatients(requests, timeout=timeout)
+        return {
+            'patient_uuids': list(response.patient_uuids),
+            'errors': list(response.errors),
+            'error': response.error or None
+        }
+
     async def get_patient(self, patient_uuid: str) -> dict:
         """Get a patient by UUID via gRPC"""
-        request = ehr_service_pb2.GetPatientRequest(patient_uuid=patient_uuid)
-        response = await self.stub.GetPatient(request)
+        request = _GetPatientRequest(patient_uuid=patient_uuid)
+        response = await self._stub().GetPatient(request, timeout=self.timeout)
         return self._patient_proto_to_dict(response.patient)
 
-    async def get_all_patients(self, skip: int = 0, limit: int = 100) -> list:
-        """Get all patients with pagination via gRPC"""
-        request = ehr_service_pb2.GetAllPatientsRequest(skip=skip, limit=limit)
-        response = await self.stub.GetAllPatients(request)
-        return [self._patient_proto_to_dict(p) for p in response.patients]
+    async def get_all_patients(self, skip: int = 0, limit: int = 100) -> AsyncIterator[dict]:
+        """Stream all patients with pagination via gRPC"""
+        request = _GetAllPatientsRequest(skip=skip, limit=limit)
+        async for patient in self._stub().GetAllPatients(request, timeout=self.stream_timeout):
+            yield self._patient_proto_to_dict(patient)
 
     async def search_patient_by_id(self, patient_id: str) -> dict:
         """Search for a patient by patient_id via gRPC"""
-        request = ehr_service_pb2.SearchPatientByIdRequest(patient_id=patient_id)
-        response = await self.stub.SearchPatientById(request)
+        request = _SearchPatientByIdRequest(patient_id=patient_id)
+        response = await self._stub().SearchPatientById(request, timeout=self.timeout)
         return self._patient_proto_to_dict(response.patient)
 
     async def update_patient(self, patient_uuid: str, patient_data: dict) -> dict:
@@ -85,18 +157,18 @@ class GrpcClient:
         # Convert dict to protobuf Struct
         update_struct = dict_to_struct(patient_data)
 
-        request = ehr_service_pb2.UpdatePatientRequest(
+        request = _UpdatePatientRequest(
             patient_uuid=patient_uuid,
             updateData=update_struct
         )
 
-        response = await self.stub.UpdatePatient(request)
+        response = await self._stub().UpdatePatient(request, timeout=self.timeout)
         return self._patient_proto_to_dict(response.patient)
 
     async def delete_patient(self, patient_uuid: str) -> dict:
         """Delete a patient via gRPC"""
-        request = ehr_service_pb2.DeletePatientRequest(patient_uuid=patient_uuid)
-        response = await self.stub.DeletePatient(request)
+        request = _DeletePatientRequest(patient_uuid=patient_uuid)
+        response = await self._stub().DeletePatient(request, timeout=self.timeout)
         return {
             'success': response.success,
             'message': response.message
@@ -104,25 +176,17 @@ class GrpcClient:
 
     def _patient_proto_to_dict(self, patient_proto) -> dict:
         """Convert protobuf patient message to dictionary"""
-        result = {
+        # Build every key in one literal so each row gets the same key layout
+        has_field = patient_proto.HasField
+        return {
             'id': patient_proto.id,
             'version': patient_proto.version,
             'lastUpdated': patient_proto.lastUpdated,
             'created_at': patient_proto.created_at,
-            'updated_at': patient_proto.updated_at
+            'updated_at': patient_proto.updated_at,
+            'identity': struct_to_dict(patient_proto.identity) if has_field('identity') else None,
+            'demographics': struct_to_dict(patient_proto.demographics) if has_field('demographics') else None,
+            'contacts': struct_to_dict(patient_proto.contacts) if has_field('contacts') else None,
+            'meta': struct_to_dict(patient_proto.meta) if has_field('meta') else None,
+            'conditions': [_value_to_python(item) for item in patient_proto.conditions.values],
         }
-
-        # Convert Struct fields to dicts
-        if patient_proto.HasField('identity'):
-            result['identity'] = MessageToDict(patient_proto.identity)
-        if patient_proto.HasField('demographics'):
-            result['demographics'] = MessageToDict(patient_proto.demographics)
-        if patient_proto.HasField('contacts'):
-            result['contacts'] = MessageToDict(patient_proto.contacts)
-        if patient_proto.HasField('meta'):
-            result['meta'] = MessageToDict(patient_proto.meta)
-
-        # Convert ListValue fields to Python lists
-        result['conditions'] = [MessageToDict(item) for item in patient_proto.conditions]
-
-        return result
@@ -1,25 +1,80 @@
 from grpc_client import GrpcClient
+from patient_cache import PatientCache
 from models import (
     PatientCreate,
     PatientUpdate,
     PatientResponse,
+    BulkCreateResponse,
     DeleteResponse,
     ErrorResponse
 )
-from fastapi import FastAPI, HTTPException, status, Depends, Query
+from fastapi import FastAPI, HTTPException, status, Body, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from typing import List
 import grpc.aio
+import orjson
 from dotenv import load_dotenv
+from google.protobuf.internal import api_implementation
 import os
+import sys
 from auth.auth import (
-    get_current_user,
     require_doctor,
-    require_doctor_or_patient
+    require_patient_access
 )
 from auth.routes import router as auth_router
 
 load_dotenv()
 
+# Fail fast if protobuf fell back to the slow pure-Python backend
+if api_implementation.Type() not in ('upb', 'cpp'):
+    raise RuntimeError(
+        f"protobuf is using the '{api_implementation.Type()}' backend; "
+        "install protobuf>=4.21 and set PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=upb")
+
+# Configuration from environment variables
+GRPC_HOST = os.getenv('GRPC_HOST', 'localhost')
+GRPC_PORT = int(os.getenv('GRPC_PORT', '50051'))
+GRPC_POOL_SIZE = int(os.getenv('GRPC_POOL_SIZE', '4'))
+GRPC_TIMEOUT = float(os.getenv('GRPC_TIMEOUT', '5'))
+GRPC_STREAM_TIMEOUT = float(os.getenv('GRPC_STREAM_TIMEOUT', '300'))
+API_HOST = os.getenv('API_HOST', '0.0.0.0')
+API_PORT = int(os.getenv('API_PORT', '8080'))
+API_WORKERS = int(os.getenv('API_WORKERS', str(os.cpu_count() or 1)))
+DEV = os.getenv('DEV') == '1'
+PATIENT_CACHE_SIZE = int(os.getenv('PATIENT_CACHE_SIZE', '10000'))
+PATIENT_CACHE_TTL = float(os.getenv('PATIENT_CACHE_TTL', '5'))
+BULK_CREATE_MAX_RECORDS = int(os.getenv('BULK_CREATE_MAX_RECORDS', '1000'))
+
+# Read cache for single-patient lookups. Each worker process has its own and
+# only sees its own invalidations, so the TTL bounds staleness across workers
+patient_cache = PatientCache(PATIENT_CACHE_SIZE, PATIENT_CACHE_TTL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one gRPC client for the lifetime of the app"""
+    async with GrpcClient(GRPC_HOST, GRPC_PORT, GRPC_POOL_SIZE, GRPC_TIMEOUT,
+                          GRPC_STREAM_TIMEOUT) as client:
+        app.state.grpc = client
+        yield
+
+
+def get_grpc_client(request: Request) -> GrpcClient:
+    """Dependency returning the shared gRPC client"""
+    return request.app.state.grpc
+
+
+async def stream_json_array(first, rest):
+    """Encode a JSON array item by item from a first item and an async iterator"""
+    if first is None:
+        yield b'[]'
+        return
+    yield b'[' + orjson.dumps(first)
+    async for item in rest:
+        yield b',' + orjson.dumps(item)
+    yield b']'
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -27,16 +82,35 @@ app = FastAPI(
     description="REST API Gateway for Distributed EHR System using gRPC",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.include_router(auth_router)
 
-# Configuration from environment variables
-GRPC_HOST = os.getenv('GRPC_HOST', 'localhost')
-GRPC_PORT = int(os.getenv('GRPC_PORT', '50051'))
-API_HOST = os.getenv('API_HOST', '0.0.0.0')
-API_PORT = int(os.getenv('API_PORT', '8080'))
+# HTTP status for each gRPC status the backend returns; anything else is a 500
+GRPC_TO_HTTP_STATUS = {
+    grpc.StatusCode.INVALID_ARGUMENT: 400,
+    grpc.StatusCode.NOT_FOUND: 404,
+    grpc.StatusCode.ALREADY_EXISTS: 409,
+    grpc.StatusCode.DEADLINE_EXCEEDED: 504,
+}
+
+
+@app.exception_handler(grpc.aio.AioRpcError)
+async def grpc_error_handler(request: Request, e: grpc.aio.AioRpcError):
+    """Translate backend gRPC errors into HTTP error responses"""
+    status_code = GRPC_TO_HTTP_STATUS.get(e.code())
+    if status_code is None:
+        return ORJSONResponse({"detail": f"gRPC error: {e.details()}"}, status_code=500)
+    return ORJSONResponse({"detail": e.details()}, status_code=status_code)
+
+
+@app.exception_handler(Exception)
+async def internal_error_handler(request: Request, e: Exception):
+    """Report unexpected errors as a 500 with the error message"""
+    return ORJSONResponse({"detail": str(e)}, status_code=500)
 
 
 @app.get("/", tags=["Health"])
@@ -51,17 +125,21 @@ async def root():
 
 @app.post(
     "/patients",
-    response_model=PatientResponse,
+    response_model=None,
     status_code=status.HTTP_201_CREATED,
     tags=["Patients"],
     summary="Create a new patient",
     responses={
-        201: {"description": "Patient created successfully"},
+        201: {"model": PatientResponse, "description": "Patient created successfully"},
         400: {"model": ErrorResponse, "description": "Invalid input"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
-async def create_patient(patient: PatientCreate, user=Depends(require_doctor)):
+async def create_patient(
+    patient: PatientCreate,
+    user=Depends(require_doctor),
+    client=Depends(get_grpc_client)
+):
     """
     Create a new patient record.
 
@@ -72,66 +150,88 @@ async def create_patient(patient: PatientCreate, user=Depends(require_doctor)):
     - **sourceHospital**: Name of the hospital node creating the record
     """
 
-    try:
-        async with GrpcClient(GRPC_HOST, GRPC_PORT) as client:
-            patient_data = patient.model_dump()
-            result = await client.create_patient(patient_data)
-            return PatientResponse(**result)
-    except grpc.aio.AioRpcError as e:
-        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
-            raise HTTPException(status_code=400, detail=e.details())
-        elif e.code() == grpc.StatusCode.ALREADY_EXISTS:
-            raise HTTPException(status_code=409, detail=e.details())
-        else:
-            raise HTTPException(
-                status_code=500, detail=f"gRPC error: {e.details()}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # mode="json" renders dates as ISO strings, ready for a Struct
+    patient_data = patient.model_dump(mode="json")
+    return await client.create_patient(patient_data)
+
+
+@app.post(
+    "/patients/bulk",
+    response_model=BulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Patients"],
+    summary="Create many patients",
+    responses={
+        201: {"description": "Batch processed; rejected records are listed in errors"},
+        422: {"description": "Invalid records, or more than BULK_CREATE_MAX_RECORDS"},
+        500: {"model": BulkCreateResponse,
+              "description": "Stopped early; records created so far are listed"}
+    }
+)
+async def bulk_create_patients(
+    # Oversized bodies fail at the first record past the limit
+    patients: List[PatientCreate] = Body(..., max_length=BULK_CREATE_MAX_RECORDS),
+    user=Depends(require_doctor),
+    client=Depends(get_grpc_client)
+):
+    """
+    Create many patient records in one request.
+
+    Records are streamed to the backend over a single gRPC call and inserted
+    in batches. Records that fail (e.g. duplicate patientId) are reported in
+    **errors** by their position in the request body. If the backend stops
+    early, the response is a 500 that still lists the records already created.
+    """
+    # mode="json" renders dates as ISO strings, ready for a Struct
+    patient_data = [patient.model_dump(mode="json") for patient in patients]
+    result = await client.bulk_create_patients(patient_data)
+    if result['error']:
+        return ORJSONResponse(result, status_code=500)
+    return result
 
 
 @app.get(
     "/patients/{patient_uuid}",
-    response_model=PatientResponse,
+    response_model=None,
     tags=["Patients"],
     summary="Get patient by UUID",
     responses={
-        200: {"description": "Patient found"},
+        200: {"model": PatientResponse, "description": "Patient found"},
         404: {"model": ErrorResponse, "description": "Patient not found"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
-async def get_patient(patient_uuid: str, user=Depends(require_doctor_or_patient)):
+async def get_patient(
+    patient_uuid: str,
+    user=Depends(require_patient_access),
+    client=Depends(get_grpc_client)
+):
     """
     Retrieve a patient by their UUID.
 
     - **patient_uuid**: The unique UUID of the patient
     """
-    if user["role"] == "patient" and user["patient_uuid"] != patient_uuid:
-        raise HTTPException(status_code=403, detail="Access denied")
+    # Patients always read their own record fresh from the backend
+    use_cache = user["role"] != "patient"
+    if use_cache:
+        cached = patient_cache.get(patient_uuid)
+        if cached is not None:
+            return cached
 
-    try:
-        async with GrpcClient(GRPC_HOST, GRPC_PORT) as client:
-            result = await client.get_patient(patient_uuid)
-            return PatientResponse(**result)
-    except grpc.aio.AioRpcError as e:
-        if e.code() == grpc.StatusCode.NOT_FOUND:
-            raise HTTPException(status_code=404, detail=e.details())
-        elif e.code() == grpc.StatusCode.INVALID_ARGUMENT:
-            raise HTTPException(status_code=400, detail=e.details())
-        else:
-            raise HTTPException(
-                status_code=500, detail=f"gRPC error: {e.details()}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    token = patient_cache.token()
+    result = await client.get_patient(patient_uuid)
+    if use_cache:
+        patient_cache.put(result, token)
+    return result
 
 
 @app.get(
     "/patients",
-    response_model=List[PatientResponse],
+    response_model=None,
     tags=["Patients"],
     summary="Get all patients",
     responses={
-        200: {"description": "List of patients"},
+        200: {"model": List[PatientResponse], "description": "List of patients"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
@@ -139,7 +239,8 @@ async def get_all_patients(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000,
                        description="Maximum number of records to return"),
-    user=Depends(require_doctor)
+    user=Depends(require_doctor),
+    client=Depends(get_grpc_client)
 ):
     """
     Retrieve all patients with pagination.
@@ -147,89 +248,83 @@ async def get_all_patients(
     - **skip**: Number of records to skip (default: 0)
     - **limit**: Maximum number of records to return (default: 100, max: 1000)
     """
-    try:
-        async with GrpcClient(GRPC_HOST, GRPC_PORT) as client:
-            results = await client.get_all_patients(skip=skip, limit=limit)
-            return [PatientResponse(**r) for r in results]
-    except grpc.aio.AioRpcError as e:
-        raise HTTPException(
-            status_code=500, detail=f"gRPC error: {e.details()}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    patients = client.get_all_patients(skip=skip, limit=limit)
+    # Pull the first record so backend errors still map to an HTTP status
+    first = await anext(patients, None)
+
+    # Records come from the trusted backend; orjson encodes the dicts as-is
+    return StreamingResponse(
+        stream_json_array(first, patients),
+        media_type="application/json"
+    )
 
 
 @app.get(
     "/patients/search/{patient_id}",
-    response_model=PatientResponse,
+    response_model=None,
     tags=["Patients"],
     summary="Search patient by patient ID",
     responses={
-        200: {"description": "Patient found"},
+        200: {"model": PatientResponse, "description": "Patient found"},
         404: {"model": ErrorResponse, "description": "Patient not found"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
-async def search_patient_by_id(patient_id: str, user=Depends(require_doctor)):
+async def search_patient_by_id(
+    patient_id: str,
+    user=Depends(require_doctor),
+    client=Depends(get_grpc_client)
+):
     """
     Search for a patient by their patient_id.
 
     - **patient_id**: The patient identifier (e.g., P001)
     """
-    try:
-        async with GrpcClient(GRPC_HOST, GRPC_PORT) as client:
-            result = await client.search_patient_by_id(patient_id)
-            return PatientResponse(**result)
-    except grpc.aio.AioRpcError as e:
-        if e.code() == grpc.StatusCode.NOT_FOUND:
-            raise HTTPException(status_code=404, detail=e.details())
-        else:
-            raise HTTPException(
-                status_code=500, detail=f"gRPC error: {e.details()}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    cached = patient_cache.get_by_patient_id(patient_id)
+    if cached is not None:
+        return cached
+
+    token = patient_cache.token()
+    result = await client.search_patient_by_id(patient_id)
+    patient_cache.put(result, token)
+    return result
 
 
 @app.put(
     "/patients/{patient_uuid}",
-    response_model=PatientResponse,
+    response_model=None,
     tags=["Patients"],
     summary="Update patient",
     responses={
-        200: {"description": "Patient updated successfully"},
+        200: {"model": PatientResponse, "description": "Patient updated successfully"},
         404: {"model": ErrorResponse, "description": "Patient not found"},
         400: {"model": ErrorResponse, "description": "Invalid input"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
-async def update_patient(patient_uuid: str, patient: PatientUpdate, user=Depends(require_doctor)):
+async def update_patient(
+    patient_uuid: str,
+    patient: PatientUpdate,
+    user=Depends(require_doctor),
+    client=Depends(get_grpc_client)
+):
     """
     Update a patient's information.
 
     - **patient_uuid**: The unique UUID of the patient
     - All fields are optional - only provided fields will be updated
     """
+    # Only include fields that are not None
+    patient_data = patient.model_dump(mode="json", exclude_none=True)
+    if not patient_data:
+        raise HTTPException(
+            status_code=400, detail="No fields to update")
+
     try:
-        async with GrpcClient(GRPC_HOST, GRPC_PORT) as client:
-            # Only include fields that are not None
-            patient_data = patient.model_dump(exclude_none=True)
-            if not patient_data:
-                raise HTTPException(
-                    status_code=400, detail="No fields to update")
-
-            result = await client.update_patient(patient_uuid, patient_data)
-            return PatientResponse(**result)
-    except grpc.aio.AioRpcError as e:
-        if e.code() == grpc.StatusCode.NOT_FOUND:
-            raise HTTPException(status_code=404, detail=e.details())
-        elif e.code() == grpc.StatusCode.INVALID_ARGUMENT:
-            raise HTTPException(status_code=400, detail=e.details())
-        else:
-            raise HTTPException(
-                status_code=500, detail=f"gRPC error: {e.details()}")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return await client.update_patient(patient_uuid, patient_data)
+    finally:
+        # Invalidate after the write so reads that raced it are not cached
+        patient_cache.invalidate(patient_uuid)
 
 
 @app.delete(
@@ -243,26 +338,22 @@ async def update_patient(patient_uuid: str, patient: PatientUpdate, user=Depends
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
-async def delete_patient(patient_uuid: str, user=Depends(require_doctor)):
+async def delete_patient(
+    patient_uuid: str,
+    user=Depends(require_doctor),
+    client=Depends(get_grpc_client)
+):
     """
     Delete a patient record.
 
     - **patient_uuid**: The unique UUID of the patient
     """
     try:
-        async with GrpcClient(GRPC_HOST, GRPC_PORT) as client:
-            result = await client.delete_patient(patient_uuid)
-            return DeleteResponse(**result)
-    except grpc.aio.AioRpcError as e:
-        if e.code() == grpc.StatusCode.NOT_FOUND:
-            raise HTTPException(status_code=404, detail=e.details())
-        elif e.code() == grpc.StatusCode.INVALID_ARGUMENT:
-            raise HTTPException(status_code=400, detail=e.details())
-        else:
-            raise HTTPException(
-                status_code=500, detail=f"gRPC error: {e.details()}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        result = await client.delete_patient(patient_uuid)
+    finally:
+        # Invalidate after the write so reads that raced it are not cached
+        patient_cache.invalidate(patient_uuid)
+    return DeleteResponse(**result)
 
 
 if __name__ == '__main__':
@@ -274,12 +365,18 @@ if __name__ == '__main__':
     print(f"API Documentation: http://localhost:{API_PORT}/docs")
     print(f"Alternative Docs: http://localhost:{API_PORT}/redoc")
     print(f"gRPC Backend: {GRPC_HOST}:{GRPC_PORT}")
+    print(f"Workers: {1 if DEV else API_WORKERS}{' (dev reload)' if DEV else ''}")
     print("=" * 60)
 
+    # Auto-reload is for development only; it forks a watcher and runs one worker.
+    # uvloop has no Windows build, so fall back to the asyncio loop there.
     uvicorn.run(
         "main:app",
         host=API_HOST,
         port=API_PORT,
-        reload=True,
+        reload=DEV,
+        workers=None if DEV else API_WORKERS,
+        loop="asyncio" if sys.platform == 'win32' else "uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -141,6 +141,13 @@ class PatientResponse(BaseModel):
         }
 
 
+class BulkCreateResponse(BaseModel):
+    """Response model for bulk create operations"""
+    patient_uuids: List[str]
+    errors: List[str]
+    error: Optional[str] = None
+
+
 class DeleteResponse(BaseModel):
     """Response model for delete operations"""
     success: bool
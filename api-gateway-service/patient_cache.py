@@ -0,0 +1,50 @@
+from typing import Optional
+from cachetools import TTLCache
+
+
+class PatientCache:
+    """Short-lived in-process cache of patient records.
+
+    Records are stored once under their UUID; lookups by patient_id go
+    through a small index pointing at that UUID, so invalidating a UUID
+    also invalidates every search that resolved to it.
+
+    Reads take a token before calling the backend and hand it back to put;
+    if any record was invalidated in between, the result may predate that
+    change and is not cached.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 5):
+        """Initialize cache with maximum entries and time-to-live in seconds"""
+        self._records = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._patient_ids = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._invalidations = 0
+
+    def get(self, patient_uuid: str) -> Optional[dict]:
+        """Return the cached record for a UUID, if any"""
+        return self._records.get(patient_uuid)
+
+    def get_by_patient_id(self, patient_id: str) -> Optional[dict]:
+        """Return the cached record for a patient_id, if any"""
+        patient_uuid = self._patient_ids.get(patient_id)
+        if patient_uuid is None:
+            return None
+        return self._records.get(patient_uuid)
+
+    def token(self) -> int:
+        """Return a token to pass to put for a backend read about to start"""
+        return self._invalidations
+
+    def put(self, patient: dict, token: int) -> None:
+        """Store a patient record returned by a read that started at token"""
+        if token != self._invalidations:
+            return
+        self._records[patient['id']] = patient
+        patient_id = (patient.get('identity') or {}).get('patientId')
+        if patient_id:
+            self._patient_ids[patient_id] = patient['id']
+
+    def invalidate(self, patient_uuid: str) -> None:
+        """Drop a patient record after it was changed or deleted"""
+        self._invalidations += 1
+        self._records.pop(patient_uuid, None)
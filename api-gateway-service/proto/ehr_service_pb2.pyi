@@ -77,11 +77,15 @@ class PatientResponse(_message.Message):
     patient: PatientMessage
     def __init__(self, patient: _Optional[_Union[PatientMessage, _Mapping]] = ...) -> None: ...
 
-class GetAllPatientsResponse(_message.Message):
-    __slots__ = ("patients",)
-    PATIENTS_FIELD_NUMBER: _ClassVar[int]
-    patients: _containers.RepeatedCompositeFieldContainer[PatientMessage]
-    def __init__(self, patients: _Optional[_Iterable[_Union[PatientMessage, _Mapping]]] = ...) -> None: ...
+class BulkCreatePatientsResponse(_message.Message):
+    __slots__ = ("patient_uuids", "errors", "error")
+    PATIENT_UUIDS_FIELD_NUMBER: _ClassVar[int]
+    ERRORS_FIELD_NUMBER: _ClassVar[int]
+    ERROR_FIELD_NUMBER: _ClassVar[int]
+    patient_uuids: _containers.RepeatedScalarFieldContainer[str]
+    errors: _containers.RepeatedScalarFieldContainer[str]
+    error: str
+    def __init__(self, patient_uuids: _Optional[_Iterable[str]] = ..., errors: _Optional[_Iterable[str]] = ..., error: _Optional[str] = ...) -> None: ...
 
 class DeletePatientResponse(_message.Message):
     __slots__ = ("success", "message")
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+# auth/ lives at the repository root, next to this service
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import main
+from auth import auth
+from auth.auth import get_current_user, require_doctor, require_patient_access
+from grpc_client import dict_to_struct, struct_to_dict
+from models import PatientCreate
+from patient_cache import PatientCache
+
+
+PATIENT_UUID = '550e8400-e29b-41d4-a716-446655440000'
+
+
+def make_record(version: int = 1, patient_id: str = 'P-1') -> dict:
+    """Build a patient record as returned by the gRPC client"""
+    return {
+        'id': PATIENT_UUID,
+        'version': version,
+        'identity': {'patientId': patient_id, 'mrn': None, 'nationalId': None},
+    }
+
+
+class StructRoundTripTest(unittest.TestCase):
+    """dict_to_struct / struct_to_dict conversions"""
+
+    def test_patient_dates_round_trip(self):
+        patient = PatientCreate(
+            identity={'patientId': 'P-1', 'mrn': 'M-1'},
+            demographics={'name': {'given': 'Jane', 'family': 'Doe'}, 'dob': '1984-03-12'},
+            contacts={'phone': '+358'},
+            sourceHospital='HOSP-A',
+        )
+
+        data = struct_to_dict(dict_to_struct(patient.model_dump(mode='json')))
+
+        self.assertEqual(data['demographics']['dob'], '1984-03-12')
+        self.assertEqual(PatientCreate.model_validate(data), patient)
+
+    def test_numbers_come_back_as_floats(self):
+        data = struct_to_dict(dict_to_struct({'count': 3, 'ratio': 0.5}))
+
+        self.assertEqual(data, {'count': 3.0, 'ratio': 0.5})
+        self.assertIsInstance(data['count'], float)
+
+    def test_nested_values_round_trip(self):
+        value = {
+            'flags': [True, False],
+            'empty': None,
+            'nested': {'items': [{'code': 'A'}, 'text', 1.5]},
+        }
+
+        self.assertEqual(struct_to_dict(dict_to_struct(value)), value)
+
+
+class PatientCacheTest(unittest.TestCase):
+    """PatientCache lookups and invalidation"""
+
+    def setUp(self):
+        self.cache = PatientCache(maxsize=10, ttl=60)
+
+    def test_put_then_get_by_uuid_and_patient_id(self):
+        record = make_record()
+        self.cache.put(record, self.cache.token())
+
+        self.assertIs(self.cache.get(PATIENT_UUID), record)
+        self.assertIs(self.cache.get_by_patient_id('P-1'), record)
+
+    def test_invalidate_drops_uuid_and_patient_id_lookups(self):
+        self.cache.put(make_record(), self.cache.token())
+        self.cache.invalidate(PATIENT_UUID)
+
+        self.assertIsNone(self.cache.get(PATIENT_UUID))
+        self.assertIsNone(self.cache.get_by_patient_id('P-1'))
+
+    def test_put_skipped_when_invalidated_during_read(self):
+        token = self.cache.token()
+        self.cache.invalidate(PATIENT_UUID)
+        self.cache.put(make_record(), token)
+
+        self.assertIsNone(self.cache.get(PATIENT_UUID))
+
+    def test_put_tolerates_null_identity(self):
+        record = dict(make_record(), identity=None)
+        self.cache.put(record, self.cache.token())
+
+        self.assertIs(self.cache.get(PATIENT_UUID), record)
+
+
+class GetCurrentUserTest(unittest.TestCase):
+    """Cached JWT payloads"""
+
+    def test_cached_payload_is_copied(self):
+        payload = {'sub': 'doctor1', 'role': 'doctor'}
+        with mock.patch.object(auth, '_decode_cached', lambda token: payload):
+            user = asyncio.run(get_current_user('token'))
+            user['role'] = 'patient'
+
+            self.assertEqual(asyncio.run(get_current_user('token'))['role'], 'doctor')
+
+
+class RequirePatientAccessTest(unittest.TestCase):
+    """require_patient_access role checks"""
+
+    def check(self, user: dict, patient_uuid: str = PATIENT_UUID) -> dict:
+        return asyncio.run(require_patient_access(patient_uuid, user=user))
+
+    def test_doctor_reads_any_record(self):
+        user = {'sub': 'doctor1', 'role': 'doctor'}
+        self.assertIs(self.check(user), user)
+
+    def test_patient_reads_own_record(self):
+        user = {'sub': 'patient1', 'role': 'patient', 'patient_uuid': PATIENT_UUID}
+        self.assertIs(self.check(user), user)
+
+    def test_patient_denied_other_record(self):
+        user = {'sub': 'patient1', 'role': 'patient', 'patient_uuid': 'someone-else'}
+        with self.assertRaises(HTTPException) as caught:
+            self.check(user)
+        self.assertEqual(caught.exception.status_code, 403)
+
+    def test_other_role_denied(self):
+        with self.assertRaises(HTTPException) as caught:
+            self.check({'sub': 'nurse1', 'role': 'nurse'})
+        self.assertEqual(caught.exception.status_code, 403)
+
+
+class BulkCreateEndpointTest(unittest.TestCase):
+    """POST /patients/bulk request limits"""
+
+    def test_too_many_records_rejected_before_backend(self):
+        record = {
+            'identity': {'patientId': 'P-1'},
+            'demographics': {'name': {'given': 'Jane', 'family': 'Doe'}, 'dob': '1984-03-12'},
+            'sourceHospital': 'HOSP-A',
+        }
+        client = mock.AsyncMock()
+        main.app.dependency_overrides = {
+            require_doctor: lambda: {'sub': 'doctor1', 'role': 'doctor'},
+            main.get_grpc_client: lambda: client,
+        }
+        self.addCleanup(main.app.dependency_overrides.clear)
+
+        response = TestClient(main.app).post(
+            '/patients/bulk', json=[record] * (main.BULK_CREATE_MAX_RECORDS + 1))
+
+        self.assertEqual(response.status_code, 422)
+        client.bulk_create_patients.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
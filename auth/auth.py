@@ -1,26 +1,48 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
+from functools import lru_cache
 import os
+import time
 
-SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret")
+SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret").encode()
 ALGORITHM = "HS256"
 
+# Longer bearer strings are decoded but never cached
+MAX_CACHED_TOKEN_LENGTH = 2048
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def _decode(token: str) -> dict:
+    # Expiry is checked by the caller so cached payloads still expire
+    return jwt.decode(
+        token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False}
+    )
+
+
+_decode_cached = lru_cache(maxsize=10000)(_decode)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        if len(token) <= MAX_CACHED_TOKEN_LENGTH:
+            # Copy so a caller changing its user dict cannot alter the cached payload
+            payload = dict(_decode_cached(token))
+        else:
+            payload = _decode(token)
+    except InvalidTokenError:
+        payload = None
+    if payload is None or payload.get("exp", float("inf")) <= time.time():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+    return payload
 
 
-def require_doctor(user=Depends(get_current_user)):
+async def require_doctor(user=Depends(get_current_user)):
     if user.get("role") != "doctor":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -29,7 +51,7 @@ def require_doctor(user=Depends(get_current_user)):
     return user
 
 
-def require_patient(user=Depends(get_current_user)):
+async def require_patient(user=Depends(get_current_user)):
     if user.get("role") != "patient":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -38,10 +60,28 @@ def require_patient(user=Depends(get_current_user)):
     return user
 
 
-def require_doctor_or_patient(user=Depends(get_current_user)):
+async def require_doctor_or_patient(user=Depends(get_current_user)):
     if user.get("role") not in ("doctor", "patient"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Unauthorized role",
         )
     return user
+
+
+async def require_patient_access(patient_uuid: str, user=Depends(get_current_user)):
+    # Doctors read any record; patients only their own
+    role = user.get("role")
+    if role == "doctor":
+        return user
+    if role != "patient":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Unauthorized role",
+        )
+    if user.get("patient_uuid") != patient_uuid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        )
+    return user
@@ -1,16 +1,16 @@
 from fastapi import APIRouter, HTTPException
 from datetime import datetime, timedelta
-from jose import jwt
+import jwt
 import os
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret")
+SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret").encode()
 ALGORITHM = "HS256"
 
 
 @router.post("/login")
-def login(username: str, password: str):
+async def login(username: str, password: str):
     # 1. Validate credentials (DB later)
     if username == "doctor1":
         role = "doctor"
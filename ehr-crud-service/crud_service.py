@@ -1,22 +1,53 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
+from beanie import UpdateResponse
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from models import Patient, PatientCreate, PatientUpdate, MetaInfo
 
 
 async def create_patient(patient: PatientCreate) -> Patient:
     """
     Create a new patient record using ORM
-    Checks for duplicate patientId before creating
+    Duplicate patientIds are rejected by the unique index on insert
     """
-    # Check if patient with this patientId already exists
-    existing_patient = await Patient.find_one(
-        Patient.identity.patientId == patient.identity.patientId
-    )
+    patient_obj = _new_patient(patient)
 
-    if existing_patient:
+    # Save to database (ORM .insert() method)
+    try:
+        await patient_obj.insert()
+    except DuplicateKeyError:
         raise ValueError(f"Patient with patientId '{patient.identity.patientId}' already exists")
 
+    return patient_obj
+
+
+async def bulk_create_patients(patients: List[PatientCreate]) -> Tuple[List[Patient], Dict[int, str]]:
+    """
+    Create several patient records with one unordered insert
+    Returns the created documents and an error message per rejected index
+    """
+    patient_objs = [_new_patient(patient) for patient in patients]
+    errors = {}
+
+    try:
+        await Patient.insert_many(patient_objs, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            index = write_error["index"]
+            if write_error.get("code") == 11000:
+                errors[index] = f"Patient with patientId '{patients[index].identity.patientId}' already exists"
+            else:
+                errors[index] = write_error.get("errmsg", "Insert failed")
+
+    created = [patient_obj for index, patient_obj in enumerate(patient_objs) if index not in errors]
+    return created, errors
+
+
+def _new_patient(patient: PatientCreate) -> Patient:
+    """
+    Build a Patient document with fresh metadata from create input
+    """
     # Create metadata
     meta = MetaInfo(
         sourceHospital=patient.sourceHospital,
@@ -27,12 +58,7 @@ async def create_patient(patient: PatientCreate) -> Patient:
     patient_dict = patient.model_dump(exclude={"sourceHospital"})
     patient_dict["meta"] = meta
 
-    patient_obj = Patient(**patient_dict)
-
-    # Save to database (ORM .insert() method)
-    await patient_obj.insert()
-
-    return patient_obj
+    return Patient(**patient_dict)
 
 
 async def get_patient(patient_uuid: UUID) -> Optional[Patient]:
@@ -42,50 +68,47 @@ async def get_patient(patient_uuid: UUID) -> Optional[Patient]:
     return await Patient.find_one(Patient.id == patient_uuid)
 
 
-async def get_all_patients(skip: int = 0, limit: int = 100) -> List[Patient]:
+async def iter_all_patients(skip: int = 0, limit: int = 100) -> AsyncIterator[Patient]:
     """
-    Retrieve all patients with pagination using ORM
+    Stream all patients with pagination from an ORM cursor
     """
-    return await Patient.find_all().skip(skip).limit(limit).to_list()
+    # One batch for the whole page instead of the server's 101-document first batch
+    async for patient in Patient.find_all(skip=skip, limit=limit, batch_size=limit):
+        yield patient
 
 
 async def update_patient(patient_uuid: UUID, patient_update: PatientUpdate) -> Optional[Patient]:
     """
     Update a patient record using ORM
+    Applies the change and version bump in one atomic round-trip
     """
-    # Find the patient
-    patient = await Patient.find_one(Patient.id == patient_uuid)
-
-    if not patient:
-        return None
-
     # Get only the fields that were actually set
     update_data = patient_update.model_dump(exclude_unset=True)
 
     if not update_data:
-        return patient
+        return await get_patient(patient_uuid)
 
     # Update the updated_at timestamp and increment version
-    update_data["updated_at"] = datetime.now(timezone.utc)
-    update_data["lastUpdated"] = datetime.now(timezone.utc)
-    update_data["version"] = patient.version + 1
-
-    # Update the document
-    await patient.set(update_data)
-
-    return patient
+    now = datetime.now(timezone.utc)
+    update_data["updated_at"] = now
+    update_data["lastUpdated"] = now
+
+    # Update the document and return the new version
+    return await Patient.find_one(Patient.id == patient_uuid).update(
+        {"$set": update_data, "$inc": {"version": 1}},
+        response_type=UpdateResponse.NEW_DOCUMENT
+    )
 
 
 async def delete_patient(patient_uuid: UUID) -> Optional[bool]:
     """
     Delete a patient record using ORM
     """
-    patient = await Patient.find_one(Patient.id == patient_uuid)
+    result = await Patient.find_one(Patient.id == patient_uuid).delete()
 
-    if not patient:
+    if not result or result.deleted_count == 0:
         return None
 
-    await patient.delete()
     return True
 
 
@@ -11,6 +11,13 @@ class DatabaseSettings(BaseSettings):
     mongodb_url: str = Field(default="mongodb://localhost:27017", alias="MONGODB_URL")
     database_name: str = Field(default="ehr_database", alias="DATABASE_NAME")
 
+    # Connection pool (per server process) and wire compression
+    mongodb_max_pool_size: int = Field(default=50, alias="MONGODB_MAX_POOL_SIZE")
+    mongodb_min_pool_size: int = Field(default=2, alias="MONGODB_MIN_POOL_SIZE")
+    mongodb_server_selection_timeout_ms: int = Field(default=2000, alias="MONGODB_SERVER_SELECTION_TIMEOUT_MS")
+    mongodb_socket_timeout_ms: int = Field(default=10000, alias="MONGODB_SOCKET_TIMEOUT_MS")
+    mongodb_compressors: str = Field(default="zstd,zlib", alias="MONGODB_COMPRESSORS")
+
     grpc_host: str = Field(default="0.0.0.0", alias="GRPC_HOST")
     grpc_port: int = Field(default=50051, alias="GRPC_PORT")
 
@@ -26,25 +33,45 @@ class DatabaseSettings(BaseSettings):
 settings = DatabaseSettings()
 
 
+def create_client() -> AsyncIOMotorClient:
+    """Create a Motor client with the configured pool and compression settings"""
+    return AsyncIOMotorClient(
+        settings.mongodb_url,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        socketTimeoutMS=settings.mongodb_socket_timeout_ms,
+        compressors=settings.mongodb_compressors
+    )
+
+
 class Database:
     client: Optional[AsyncIOMotorClient] = None
 
     @classmethod
-    async def initialize(cls):
+    async def initialize(cls, sync_indexes: bool = True):
+        """Connect and initialize Beanie; sync_indexes=False leaves indexes untouched"""
         from models import Patient
 
         if cls.client is None:
-            cls.client = AsyncIOMotorClient(settings.mongodb_url)
+            cls.client = create_client()
 
+        # Connect now so the pool starts filling before the first request
+        await cls.client.admin.command("ping")
+
+        database = cls.client[settings.database_name]
+        if sync_indexes:
+            await drop_legacy_indexes(database)
         await init_beanie(
-            database=cls.client[settings.database_name],
-            document_models=[Patient]
+            database=database,
+            document_models=[Patient],
+            skip_indexes=not sync_indexes
         )
 
     @classmethod
     def get_client(cls) -> AsyncIOMotorClient:
         if cls.client is None:
-            cls.client = AsyncIOMotorClient(settings.mongodb_url)
+            cls.client = create_client()
         return cls.client
 
     @classmethod
@@ -59,6 +86,14 @@ class Database:
             cls.client = None
 
 
+async def drop_legacy_indexes(database):
+    """Drop the old non-unique patientId index so the unique one can replace it"""
+    collection = database["patients"]
+    legacy = (await collection.index_information()).get("identity.patientId_1")
+    if legacy is not None and not legacy.get("unique"):
+        await collection.drop_index("identity.patientId_1")
+
+
 def get_patient_collection():
     db = Database.get_database()
     return db["patients"]
@@ -1,93 +1,163 @@
 import asyncio
 import grpc
-from concurrent import futures
+import multiprocessing
+import multiprocessing.connection
+import signal
+import sys
 from uuid import UUID
-from datetime import date, datetime
+from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from google.protobuf.struct_pb2 import Struct, ListValue
-from google.protobuf.json_format import MessageToDict
+from cachetools import LRUCache
+from google.protobuf.internal import api_implementation
+
+try:
+    import uvloop
+except ImportError:  # uvloop has no Windows build
+    uvloop = None
 
 from proto import ehr_service_pb2_grpc, ehr_service_pb2
 import crud_service
 from database import Database
-from models import PatientCreate, PatientUpdate
+from models import ContactInfo, PatientCreate, PatientUpdate
 
 load_dotenv()
 
+# Fail fast if protobuf fell back to the slow pure-Python backend
+if api_implementation.Type() not in ('upb', 'cpp'):
+    raise RuntimeError(
+        f"protobuf is using the '{api_implementation.Type()}' backend; "
+        "install protobuf>=4.21 and set PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=upb")
+
 # gRPC server configuration
 GRPC_HOST = os.getenv('GRPC_HOST', '0.0.0.0')
 GRPC_PORT = int(os.getenv('GRPC_PORT', '50051'))
-
-# Date field mappings
-DATE_FIELDS = {'dob', 'onset'}  # Fields that should be parsed as date
-DATETIME_FIELDS = {'recordedAt'}  # Fields that should be parsed as datetime
-
-
-def parse_dates_recursive(obj):
+# Server processes sharing the port via SO_REUSEPORT (defaults to CPU count)
+GRPC_WORKERS = int(os.getenv('GRPC_WORKERS', str(os.cpu_count() or 1)))
+
+# HTTP/2 tuning for many concurrent gateway streams
+SERVER_OPTIONS = [
+    ('grpc.so_reuseport', 1),  # Worker processes share the listening port
+    ('grpc.max_concurrent_streams', 1000),  # Streams per connection (default 100)
+    ('grpc.http2.lookahead_bytes', 2 * 1024 * 1024),  # Per-stream flow-control window
+    ('grpc.max_receive_message_length', 16 * 1024 * 1024),  # Matches the gateway's 16 MB limit
+    ('grpc.keepalive_time_ms', 30000),  # Ping idle connections every 30 s
+    ('grpc.keepalive_timeout_ms', 10000),  # Drop connections that miss a ping ack
+    ('grpc.http2.max_pings_without_data', 0),  # Allow pings on connections without data
+    ('grpc.http2.min_time_between_pings_ms', 10000),  # Lower bound between our own pings
+    ('grpc.http2.min_ping_interval_without_data_ms', 5000),  # Accept the gateway's 10 s keepalive
+]
+
+# Records per insert_many call in BulkCreatePatients, and per request
+BULK_CREATE_BATCH_SIZE = 64
+BULK_CREATE_MAX_RECORDS = int(os.getenv('BULK_CREATE_MAX_RECORDS', '1000'))
+
+# Serialized PatientMessage bytes by (UUID string, version). Every update
+# bumps the version, so an entry never goes stale and needs no invalidation.
+ENCODED_PATIENT_CACHE_SIZE = int(os.getenv('ENCODED_PATIENT_CACHE_SIZE', '20000'))
+encoded_patients = LRUCache(maxsize=ENCODED_PATIENT_CACHE_SIZE)
+
+# GetPatient loads in progress by UUID string; concurrent requests share one
+patient_loads = {}
+
+# Patient fields carried as Struct/ListValue in PatientMessage
+STRUCT_FIELDS = {'identity', 'demographics', 'contacts', 'conditions', 'meta'}
+
+# Contacts sent for a patient without any, with every field present as null
+EMPTY_CONTACTS = ContactInfo().model_dump(mode='json')
+
+
+def struct_to_dict(struct) -> dict:
     """
-    Recursively parse ISO date/datetime strings in nested structures.
-    Handles both dict and list structures.
+    Convert a request Struct to a Python dict in a single pass.
+    Date strings are left to the typed Pydantic fields to parse.
     """
-    if isinstance(obj, dict):
-        return {
-            key: _parse_date_field(key, value) if isinstance(value, str)
-            else parse_dates_recursive(value)
-            for key, value in obj.items()
-        }
-    elif isinstance(obj, list):
-        return [parse_dates_recursive(item) for item in obj]
-    return obj
-
-
-def _parse_date_field(key: str, value: str):
-    """Parse a single date/datetime field based on its key."""
-    try:
-        if key in DATE_FIELDS:
-            return date.fromisoformat(value)
-        elif key in DATETIME_FIELDS:
-            return datetime.fromisoformat(value)
-    except (ValueError, AttributeError):
-        pass  # Return original value if parsing fails
-    return value
-
-
-def dict_to_struct(data: dict) -> Struct:
-    """Convert Python dict to protobuf Struct."""
-    struct = Struct()
-    struct.update(data)
-    return struct
-
-
-def list_to_listvalue(data: list) -> ListValue:
-    """Convert Python list to protobuf ListValue."""
-    list_value = ListValue()
-    for item in data:
-        if isinstance(item, dict):
-            struct = Struct()
-            struct.update(item)
-            list_value.values.add().struct_value.CopyFrom(struct)
-        else:
-            list_value.values.add().string_value = str(item)
-    return list_value
+    return {key: _value_to_python(value) for key, value in struct.fields.items()}
+
+
+def _value_to_python(value):
+    """Convert a protobuf Value to the matching Python object."""
+    kind = value.WhichOneof('kind')
+    if kind == 'string_value':
+        return value.string_value
+    if kind == 'struct_value':
+        return struct_to_dict(value.struct_value)
+    if kind == 'list_value':
+        return [_value_to_python(item) for item in value.list_value.values]
+    if kind == 'number_value':
+        return value.number_value
+    if kind == 'bool_value':
+        return value.bool_value
+    return None
+
+
+def forget_load(key: str, load: asyncio.Future) -> None:
+    """Remove a finished load unless a write already detached it."""
+    if patient_loads.get(key) is load:
+        del patient_loads[key]
+
+
+async def load_patient_bytes(patient_uuid: UUID) -> bytes | None:
+    """Fetch a patient as serialized PatientMessage bytes; None if missing."""
+    patient = await crud_service.get_patient(patient_uuid)
+    if not patient:
+        return None
+    return encode_patient(patient)
+
+
+def encode_patient(patient) -> bytes:
+    """Serialize a patient to PatientMessage bytes, memoized by id and version."""
+    key = (str(patient.id), patient.version)
+    data = encoded_patients.get(key)
+    if data is None:
+        data = patient_to_proto(patient).SerializeToString()
+        encoded_patients[key] = data
+    return data
+
+
+def patient_message(patient) -> ehr_service_pb2.PatientMessage:
+    """Return a patient's PatientMessage, parsed from the memo on a hit."""
+    key = (str(patient.id), patient.version)
+    data = encoded_patients.get(key)
+    if data is not None:
+        return ehr_service_pb2.PatientMessage.FromString(data)
+    message = patient_to_proto(patient)
+    encoded_patients[key] = message.SerializeToString()
+    return message
+
+
+def iso_timestamp(value: datetime) -> str:
+    """
+    Format a timestamp as UTC ISO 8601 with millisecond precision.
+    MongoDB keeps milliseconds and returns naive UTC, so fresh and re-read
+    documents render the same way.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec='milliseconds') + 'Z'
 
 
 def patient_to_proto(patient) -> ehr_service_pb2.PatientMessage:
     """Convert Patient model to protobuf PatientMessage."""
-    patient_dict = patient.model_dump(mode='json')
+    patient_dict = patient.model_dump(mode='json', include=STRUCT_FIELDS)
 
-    return ehr_service_pb2.PatientMessage(
+    message = ehr_service_pb2.PatientMessage(
         id=str(patient.id),
         version=patient.version,
-        lastUpdated=patient.lastUpdated.isoformat(),
-        identity=dict_to_struct(patient_dict.get('identity', {})),
-        demographics=dict_to_struct(patient_dict.get('demographics', {})),
-        contacts=dict_to_struct(patient_dict.get('contacts', {})) if patient_dict.get('contacts') else Struct(),
-        conditions=list_to_listvalue(patient_dict.get('conditions', [])),
-        meta=dict_to_struct(patient_dict.get('meta', {})),
-        created_at=patient.created_at.isoformat(),
-        updated_at=patient.updated_at.isoformat(),
+        lastUpdated=iso_timestamp(patient.lastUpdated),
+        created_at=iso_timestamp(patient.created_at),
+        updated_at=iso_timestamp(patient.updated_at),
     )
+    # Fill the message's own Struct fields in place instead of building
+    # standalone Structs that the constructor would copy again
+    message.identity.update(patient_dict['identity'])
+    message.demographics.update(patient_dict['demographics'])
+    message.meta.update(patient_dict['meta'])
+    message.contacts.update(patient_dict['contacts'] or EMPTY_CONTACTS)
+    message.conditions.extend(patient_dict['conditions'])
+    return message
+
+
 class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
     """gRPC service implementation for EHR operations."""
 
@@ -107,7 +177,7 @@ class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
     async def CreatePatient(self, request, context):
         """Create a new patient record."""
         try:
-            patient_data = parse_dates_recursive(MessageToDict(request.patientData))
+            patient_data = struct_to_dict(request.patientData)
             patient_create = PatientCreate(**patient_data)
             new_patient = await crud_service.create_patient(patient_create)
 
@@ -120,6 +190,46 @@ class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
             self._set_error(context, grpc.StatusCode.INTERNAL, f'Error creating patient: {str(e)}')
             return ehr_service_pb2.PatientResponse()
 
+    async def _insert_batch(self, batch, batch_indexes, response):
+        """Insert one batch of bulk-created patients and record the outcome."""
+        created, errors = await crud_service.bulk_create_patients(batch)
+        response.patient_uuids.extend(str(patient.id) for patient in created)
+        for batch_index, message in sorted(errors.items()):
+            response.errors.append(f'Record {batch_indexes[batch_index]}: {message}')
+
+    async def BulkCreatePatients(self, request_iterator, context):
+        """Create patient records streamed by the client, inserting them in batches."""
+        response = ehr_service_pb2.BulkCreatePatientsResponse()
+        batch = []
+        batch_indexes = []
+
+        try:
+            index = 0
+            async for request in request_iterator:
+                if index >= BULK_CREATE_MAX_RECORDS:
+                    response.error = (f'Too many records; only the first '
+                                      f'{BULK_CREATE_MAX_RECORDS} were processed')
+                    break
+                try:
+                    batch.append(PatientCreate(**struct_to_dict(request.patientData)))
+                    batch_indexes.append(index)
+                except ValueError as e:
+                    response.errors.append(f'Record {index}: {str(e)}')
+                index += 1
+
+                if len(batch) >= BULK_CREATE_BATCH_SIZE:
+                    await self._insert_batch(batch, batch_indexes, response)
+                    batch, batch_indexes = [], []
+
+            if batch:
+                await self._insert_batch(batch, batch_indexes, response)
+            return response
+
+        except Exception as e:
+            # Earlier batches are already stored, so report them with the error
+            response.error = f'Error creating patients: {str(e)}'
+            return response
+
     async def GetPatient(self, request, context):
         """Get a patient by UUID."""
         try:
@@ -127,32 +237,40 @@ class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
             if not patient_uuid:
                 return ehr_service_pb2.PatientResponse()
 
-            patient = await crud_service.get_patient(patient_uuid)
-            if not patient:
+            # Join a load already in flight for this UUID, or start one
+            key = str(patient_uuid)
+            load = patient_loads.get(key)
+            if load is None:
+                load = asyncio.ensure_future(load_patient_bytes(patient_uuid))
+                patient_loads[key] = load
+                load.add_done_callback(lambda done: forget_load(key, done))
+            # Shield so one cancelled caller does not cancel the shared load
+            data = await asyncio.shield(load)
+
+            if data is None:
                 self._set_error(context, grpc.StatusCode.NOT_FOUND,
                               f'Patient with UUID {patient_uuid} not found')
                 return ehr_service_pb2.PatientResponse()
 
-            return ehr_service_pb2.PatientResponse(patient=patient_to_proto(patient))
+            response = ehr_service_pb2.PatientResponse()
+            response.patient.MergeFromString(data)
+            return response
 
         except Exception as e:
             self._set_error(context, grpc.StatusCode.INTERNAL, f'Error retrieving patient: {str(e)}')
             return ehr_service_pb2.PatientResponse()
 
     async def GetAllPatients(self, request, context):
-        """Get all patients with pagination."""
+        """Stream all patients with pagination, one message per patient."""
         try:
             skip = max(0, request.skip)
             limit = max(1, min(request.limit, 1000)) if request.limit > 0 else 100
 
-            patients = await crud_service.get_all_patients(skip=skip, limit=limit)
-            patient_messages = [patient_to_proto(p) for p in patients]
-
-            return ehr_service_pb2.GetAllPatientsResponse(patients=patient_messages)
+            async for patient in crud_service.iter_all_patients(skip=skip, limit=limit):
+                yield patient_message(patient)
 
         except Exception as e:
             self._set_error(context, grpc.StatusCode.INTERNAL, f'Error retrieving patients: {str(e)}')
-            return ehr_service_pb2.GetAllPatientsResponse()
 
     async def SearchPatientById(self, request, context):
         """Search for a patient by patient_id."""
@@ -176,9 +294,13 @@ class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
             if not patient_uuid:
                 return ehr_service_pb2.PatientResponse()
 
-            update_data = parse_dates_recursive(MessageToDict(request.updateData))
+            update_data = struct_to_dict(request.updateData)
             patient_update = PatientUpdate(**update_data)
-            updated_patient = await crud_service.update_patient(patient_uuid, patient_update)
+            try:
+                updated_patient = await crud_service.update_patient(patient_uuid, patient_update)
+            finally:
+                # Later reads must not join a load that started before the write
+                patient_loads.pop(str(patient_uuid), None)
 
             if not updated_patient:
                 self._set_error(context, grpc.StatusCode.NOT_FOUND,
@@ -201,7 +323,11 @@ class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
                     message='Invalid UUID format'
                 )
 
-            deleted = await crud_service.delete_patient(patient_uuid)
+            try:
+                deleted = await crud_service.delete_patient(patient_uuid)
+            finally:
+                # Later reads must not join a load that started before the write
+                patient_loads.pop(str(patient_uuid), None)
             if not deleted:
                 # Set NOT_FOUND status code for missing patient
                 self._set_error(context, grpc.StatusCode.NOT_FOUND,
@@ -222,18 +348,22 @@ class EhrServiceServicer(ehr_service_pb2_grpc.EhrServiceServicer):
                 success=False,
                 message=f'Error deleting patient: {str(e)}'
             )
-async def serve():
+async def serve(sync_indexes: bool = True):
     """Start the gRPC server."""
     print("=" * 50)
     print("EHR CRUD Service - gRPC Server")
     print("=" * 50)
 
     # Initialize database
-    await Database.initialize()
+    await Database.initialize(sync_indexes=sync_indexes)
     print(f"✓ Database initialized")
 
-    # Create and configure gRPC server
-    server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Create and configure gRPC server; gzip shrinks the repetitive Struct keys.
+    # The aio server dispatches RPCs on its event loop, so no thread pool is needed.
+    server = grpc.aio.server(
+        options=SERVER_OPTIONS,
+        compression=grpc.Compression.Gzip
+    )
     ehr_service_pb2_grpc.add_EhrServiceServicer_to_server(EhrServiceServicer(), server)
 
     listen_addr = f'{GRPC_HOST}:{GRPC_PORT}'
@@ -244,6 +374,13 @@ async def serve():
     print(f"✓ Server started successfully")
     print("=" * 50)
 
+    # Stop gracefully on SIGTERM (docker stop, or the parent stopping its workers)
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, lambda: asyncio.ensure_future(server.stop(grace=5)))
+    except NotImplementedError:  # Not supported by Windows event loops
+        pass
+
     try:
         await server.wait_for_termination()
     except KeyboardInterrupt:
@@ -255,8 +392,66 @@ async def serve():
         print("✓ Server stopped")
 
 
-if __name__ == '__main__':
+def run_worker(sync_indexes: bool = True):
+    """Run one server process until interrupted."""
     try:
-        asyncio.run(serve())
+        if uvloop is not None:
+            uvloop.run(serve(sync_indexes))
+        else:
+            asyncio.run(serve(sync_indexes))
     except KeyboardInterrupt:
         print("\nServer terminated by user")
+
+
+async def sync_indexes():
+    """Create the database indexes once, before any worker starts."""
+    await Database.initialize()
+    await Database.close_connection()
+
+
+def run_workers(count: int) -> int:
+    """Run count worker processes until one exits or SIGTERM; return the exit code."""
+    # Spawned (not forked) workers each get their own loop and Mongo pool
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=run_worker, args=(False,)) for _ in range(count)]
+    stopping = False
+
+    def terminate_workers():
+        """Send SIGTERM to every worker that is still running."""
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    def handle_sigterm(signum, frame):
+        """Forward SIGTERM (e.g. from docker stop) to the workers."""
+        nonlocal stopping
+        stopping = True
+        terminate_workers()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    for worker in workers:
+        worker.start()
+
+    try:
+        # Any worker exiting leaves the node short of capacity, so stop them all
+        multiprocessing.connection.wait([worker.sentinel for worker in workers])
+    except KeyboardInterrupt:
+        # Ctrl+C reaches every worker in the process group, so just wait for them
+        stopping = True
+    else:
+        if not stopping:
+            print("A worker exited unexpectedly; stopping the server")
+        terminate_workers()
+
+    for worker in workers:
+        worker.join()
+    return 0 if stopping else 1
+
+
+if __name__ == '__main__':
+    if GRPC_WORKERS <= 1:
+        run_worker()
+    else:
+        # Workers skip index changes so they do not race each other on startup
+        asyncio.run(sync_indexes())
+        sys.exit(run_workers(GRPC_WORKERS))
@@ -1,4 +1,5 @@
 from beanie import Document
+from pymongo import IndexModel, ASCENDING
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime, timezone
@@ -97,9 +98,10 @@ class Patient(Document):
 
     class Settings:
         name = "patients"
-        use_state_management = True
+        use_state_management = False  # Updates use an atomic $set, not change tracking
         indexes = [
-            "identity.patientId",  # Index on patientId for fast lookups
+            # Unique patientId index; also rejects duplicate creates
+            IndexModel([("identity.patientId", ASCENDING)], unique=True),
             "identity.mrn",
             "created_at",
         ]
@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import struct_pb2 as google_dot_protobuf_dot_struct__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x65hr_service.proto\x12\x03\x65hr\x1a\x1cgoogle/protobuf/struct.proto\"\xc6\x02\n\x0ePatientMessage\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x13\n\x0blastUpdated\x18\x03 \x01(\t\x12)\n\x08identity\x18\x04 \x01(\x0b\x32\x17.google.protobuf.Struct\x12-\n\x0c\x64\x65mographics\x18\x05 \x01(\x0b\x32\x17.google.protobuf.Struct\x12)\n\x08\x63ontacts\x18\x06 \x01(\x0b\x32\x17.google.protobuf.Struct\x12.\n\nconditions\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.ListValue\x12%\n\x04meta\x18\x08 \x01(\x0b\x32\x17.google.protobuf.Struct\x12\x12\n\ncreated_at\x18\t \x01(\t\x12\x12\n\nupdated_at\x18\n \x01(\t\"D\n\x14\x43reatePatientRequest\x12,\n\x0bpatientData\x18\x01 \x01(\x0b\x32\x17.google.protobuf.Struct\")\n\x11GetPatientRequest\x12\x14\n\x0cpatient_uuid\x18\x01 \x01(\t\"4\n\x15GetAllPatientsRequest\x12\x0c\n\x04skip\x18\x01 \x01(\x05\x12\r\n\x05limit\x18\x02 \x01(\x05\".\n\x18SearchPatientByIdRequest\x12\x12\n\npatient_id\x18\x01 \x01(\t\"Y\n\x14UpdatePatientRequest\x12\x14\n\x0cpatient_uuid\x18\x01 \x01(\t\x12+\n\nupdateData\x18\x02 \x01(\x0b\x32\x17.google.protobuf.Struct\",\n\x14\x44\x65letePatientRequest\x12\x14\n\x0cpatient_uuid\x18\x01 \x01(\t\"7\n\x0fPatientResponse\x12$\n\x07patient\x18\x01 \x01(\x0b\x32\x13.ehr.PatientMessage\"?\n\x16GetAllPatientsResponse\x12%\n\x08patients\x18\x01 \x03(\x0b\x32\x13.ehr.PatientMessage\"9\n\x15\x44\x65letePatientResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xa9\x03\n\nEhrService\x12@\n\rCreatePatient\x12\x19.ehr.CreatePatientRequest\x1a\x14.ehr.PatientResponse\x12:\n\nGetPatient\x12\x16.ehr.GetPatientRequest\x1a\x14.ehr.PatientResponse\x12I\n\x0eGetAllPatients\x12\x1a.ehr.GetAllPatientsRequest\x1a\x1b.ehr.GetAllPatientsResponse\x12H\n\x11SearchPatientById\x12\x1d.ehr.SearchPatientByIdRequest\x1a\x14.ehr.PatientResponse\x12@\n\rUpdatePatient\x12\x19.ehr.UpdatePatientRequest\x1a\x14.ehr.PatientResponse\x12\x46\n\rDeletePatient\x12\x19.ehr.DeletePatientRequest\x1a\x1a.ehr.DeletePatientResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x65hr_service.proto\x12\x03\x65hr\x1a\x1cgoogle/protobuf/struct.proto\"\xc6\x02\n\x0ePatientMessage\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x13\n\x0blastUpdated\x18\x03 \x01(\t\x12)\n\x08identity\x18\x04 \x01(\x0b\x32\x17.google.protobuf.Struct\x12-\n\x0c\x64\x65mographics\x18\x05 \x01(\x0b\x32\x17.google.protobuf.Struct\x12)\n\x08\x63ontacts\x18\x06 \x01(\x0b\x32\x17.google.protobuf.Struct\x12.\n\nconditions\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.ListValue\x12%\n\x04meta\x18\x08 \x01(\x0b\x32\x17.google.protobuf.Struct\x12\x12\n\ncreated_at\x18\t \x01(\t\x12\x12\n\nupdated_at\x18\n \x01(\t\"D\n\x14\x43reatePatientRequest\x12,\n\x0bpatientData\x18\x01 \x01(\x0b\x32\x17.google.protobuf.Struct\")\n\x11GetPatientRequest\x12\x14\n\x0cpatient_uuid\x18\x01 \x01(\t\"4\n\x15GetAllPatientsRequest\x12\x0c\n\x04skip\x18\x01 \x01(\x05\x12\r\n\x05limit\x18\x02 \x01(\x05\".\n\x18SearchPatientByIdRequest\x12\x12\n\npatient_id\x18\x01 \x01(\t\"Y\n\x14UpdatePatientRequest\x12\x14\n\x0cpatient_uuid\x18\x01 \x01(\t\x12+\n\nupdateData\x18\x02 \x01(\x0b\x32\x17.google.protobuf.Struct\",\n\x14\x44\x65letePatientRequest\x12\x14\n\x0cpatient_uuid\x18\x01 \x01(\t\"7\n\x0fPatientResponse\x12$\n\x07patient\x18\x01 \x01(\x0b\x32\x13.ehr.PatientMessage\"R\n\x1a\x42ulkCreatePatientsResponse\x12\x15\n\rpatient_uuids\x18\x01 \x03(\t\x12\x0e\n\x06\x65rrors\x18\x02 \x03(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"9\n\x15\x44\x65letePatientResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xf7\x03\n\nEhrService\x12@\n\rCreatePatient\x12\x19.ehr.CreatePatientRequest\x1a\x14.ehr.PatientResponse\x12R\n\x12\x42ulkCreatePatients\x12\x19.ehr.CreatePatientRequest\x1a\x1f.ehr.BulkCreatePatientsResponse(\x01\x12:\n\nGetPatient\x12\x16.ehr.GetPatientRequest\x1a\x14.ehr.PatientResponse\x12\x43\n\x0eGetAllPatients\x12\x1a.ehr.GetAllPatientsRequest\x1a\x13.ehr.PatientMessage0\x01\x12H\n\x11SearchPatientById\x12\x1d.ehr.SearchPatientByIdRequest\x1a\x14.ehr.PatientResponse\x12@\n\rUpdatePatient\x12\x19.ehr.UpdatePatientRequest\x1a\x14.ehr.PatientResponse\x12\x46\n\rDeletePatient\x12\x19.ehr.DeletePatientRequest\x1a\x1a.ehr.DeletePatientResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -48,10 +48,10 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_DELETEPATIENTREQUEST']._serialized_end=735
   _globals['_PATIENTRESPONSE']._serialized_start=737
   _globals['_PATIENTRESPONSE']._serialized_end=792
-  _globals['_GETALLPATIENTSRESPONSE']._serialized_start=794
-  _globals['_GETALLPATIENTSRESPONSE']._serialized_end=857
-  _globals['_DELETEPATIENTRESPONSE']._serialized_start=859
-  _globals['_DELETEPATIENTRESPONSE']._serialized_end=916
-  _globals['_EHRSERVICE']._serialized_start=919
-  _globals['_EHRSERVICE']._serialized_end=1344
+  _globals['_BULKCREATEPATIENTSRESPONSE']._serialized_start=794
+  _globals['_BULKCREATEPATIENTSRESPONSE']._serialized_end=876
+  _globals['_DELETEPATIENTRESPONSE']._serialized_start=878
+  _globals['_DELETEPATIENTRESPONSE']._serialized_end=935
+  _globals['_EHRSERVICE']._serialized_start=938
+  _globals['_EHRSERVICE']._serialized_end=1441
 # @@protoc_insertion_point(module_scope)
@@ -40,15 +40,20 @@ class EhrServiceStub(object):
                 request_serializer=ehr__service__pb2.CreatePatientRequest.SerializeToString,
                 response_deserializer=ehr__service__pb2.PatientResponse.FromString,
                 _registered_method=True)
+        self.BulkCreatePatients = channel.stream_unary(
+                '/ehr.EhrService/BulkCreatePatients',
+                request_serializer=ehr__service__pb2.CreatePatientRequest.SerializeToString,
+                response_deserializer=ehr__service__pb2.BulkCreatePatientsResponse.FromString,
+                _registered_method=True)
         self.GetPatient = channel.unary_unary(
                 '/ehr.EhrService/GetPatient',
                 request_serializer=ehr__service__pb2.GetPatientRequest.SerializeToString,
                 response_deserializer=ehr__service__pb2.PatientResponse.FromString,
                 _registered_method=True)
-        self.GetAllPatients = channel.unary_unary(
+        self.GetAllPatients = channel.unary_stream(
                 '/ehr.EhrService/GetAllPatients',
                 request_serializer=ehr__service__pb2.GetAllPatientsRequest.SerializeToString,
-                response_deserializer=ehr__service__pb2.GetAllPatientsResponse.FromString,
+                response_deserializer=ehr__service__pb2.PatientMessage.FromString,
                 _registered_method=True)
         self.SearchPatientById = channel.unary_unary(
                 '/ehr.EhrService/SearchPatientById',
@@ -78,6 +83,13 @@ class EhrServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BulkCreatePatients(self, request_iterator, context):
+        """Create many patient records streamed over one call
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetPatient(self, request, context):
         """Get a patient by UUID
         """
@@ -86,7 +98,7 @@ class EhrServiceServicer(object):
         raise NotImplementedError('Method not implemented!')
 
     def GetAllPatients(self, request, context):
-        """Get all patients with pagination
+        """Stream all patients with pagination
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -121,15 +133,20 @@ def add_EhrServiceServicer_to_server(servicer, server):
                     request_deserializer=ehr__service__pb2.CreatePatientRequest.FromString,
                     response_serializer=ehr__service__pb2.PatientResponse.SerializeToString,
             ),
+            'BulkCreatePatients': grpc.stream_unary_rpc_method_handler(
+                    servicer.BulkCreatePatients,
+                    request_deserializer=ehr__service__pb2.CreatePatientRequest.FromString,
+                    response_serializer=ehr__service__pb2.BulkCreatePatientsResponse.SerializeToString,
+            ),
             'GetPatient': grpc.unary_unary_rpc_method_handler(
                     servicer.GetPatient,
                     request_deserializer=ehr__service__pb2.GetPatientRequest.FromString,
                     response_serializer=ehr__service__pb2.PatientResponse.SerializeToString,
             ),
-            'GetAllPatients': grpc.unary_unary_rpc_method_handler(
+            'GetAllPatients': grpc.unary_stream_rpc_method_handler(
                     servicer.GetAllPatients,
                     request_deserializer=ehr__service__pb2.GetAllPatientsRequest.FromString,
-                    response_serializer=ehr__service__pb2.GetAllPatientsResponse.SerializeToString,
+                    response_serializer=ehr__service__pb2.PatientMessage.SerializeToString,
             ),
             'SearchPatientById': grpc.unary_unary_rpc_method_handler(
                     servicer.SearchPatientById,
@@ -185,6 +202,33 @@ class EhrService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def BulkCreatePatients(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/ehr.EhrService/BulkCreatePatients',
+            ehr__service__pb2.CreatePatientRequest.SerializeToString,
+            ehr__service__pb2.BulkCreatePatientsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetPatient(request,
             target,
@@ -223,12 +267,12 @@ class EhrService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(
+        return grpc.experimental.unary_stream(
             request,
             target,
             '/ehr.EhrService/GetAllPatients',
             ehr__service__pb2.GetAllPatientsRequest.SerializeToString,
-            ehr__service__pb2.GetAllPatientsResponse.FromString,
+            ehr__service__pb2.PatientMessage.FromString,
             options,
             channel_credentials,
             insecure,
@@ -0,0 +1,257 @@
+import asyncio
+import unittest
+from datetime import date, datetime, timezone
+from unittest import mock
+from uuid import uuid4
+
+import grpc
+from pymongo.errors import BulkWriteError
+
+import crud_service
+import grpc_server
+from models import MetaInfo, Patient, PatientCreate, PatientUpdate
+from proto import ehr_service_pb2
+
+
+PATIENT_UUID = uuid4()
+
+
+def make_patient(version: int) -> Patient:
+    """Build a Patient document without a database connection"""
+    created = PatientCreate(
+        identity={'patientId': 'P-1'},
+        demographics={'name': {'given': 'Jane', 'family': 'Doe'}, 'dob': '1984-03-12'},
+        sourceHospital='HOSP-A',
+    )
+    now = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    return Patient.model_construct(
+        id=PATIENT_UUID,
+        version=version,
+        lastUpdated=now,
+        created_at=now,
+        updated_at=now,
+        identity=created.identity,
+        demographics=created.demographics,
+        contacts=None,
+        conditions=[],
+        meta=MetaInfo(sourceHospital='HOSP-A'),
+    )
+
+
+class FakeContext:
+    """Records the status a handler sets on a gRPC context"""
+
+    def __init__(self):
+        self.code = None
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        pass
+
+
+class StructToDictTest(unittest.TestCase):
+    """Request Struct conversion"""
+
+    def test_dates_are_parsed_by_the_models(self):
+        struct = ehr_service_pb2.UpdatePatientRequest().updateData
+        struct.update({
+            'conditions': [{
+                'description': 'flu',
+                'onset': '2024-01-02',
+                'recordedAt': '2024-01-03T10:00:00Z',
+            }],
+        })
+
+        update = PatientUpdate(**grpc_server.struct_to_dict(struct))
+
+        condition = update.conditions[0]
+        self.assertEqual(condition.onset, date(2024, 1, 2))
+        self.assertEqual(condition.recordedAt, datetime(2024, 1, 3, 10, tzinfo=timezone.utc))
+
+    def test_numbers_come_back_as_floats(self):
+        struct = ehr_service_pb2.UpdatePatientRequest().updateData
+        struct.update({'count': 3, 'flags': [True, None]})
+
+        self.assertEqual(grpc_server.struct_to_dict(struct), {'count': 3.0, 'flags': [True, None]})
+
+
+class PatientToProtoTest(unittest.TestCase):
+    """Patient encoding"""
+
+    def test_timestamps_are_utc_milliseconds(self):
+        message = grpc_server.patient_to_proto(make_patient(1))
+
+        self.assertEqual(message.created_at, '2026-01-02T03:04:05.678Z')
+
+    def test_missing_contacts_have_null_fields(self):
+        message = grpc_server.patient_to_proto(make_patient(1))
+
+        self.assertEqual(set(message.contacts.fields), {'address', 'phone', 'email'})
+
+
+class LoadCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    """GetPatient load sharing against concurrent updates and deletes"""
+
+    def setUp(self):
+        grpc_server.patient_loads.clear()
+        grpc_server.encoded_patients.clear()
+        self.servicer = grpc_server.EhrServiceServicer()
+        self.version = 1
+        self.reads = 0
+        self.read_gate = asyncio.Event()
+        self.read_gate.set()
+
+    async def get_patient(self, patient_uuid):
+        # Snapshot the stored version, then wait as a slow read would
+        self.reads += 1
+        patient = make_patient(self.version) if self.version else None
+        await self.read_gate.wait()
+        return patient
+
+    async def update_patient(self, patient_uuid, patient_update):
+        self.version += 1
+        return make_patient(self.version)
+
+    async def delete_patient(self, patient_uuid):
+        self.version = 0
+        return True
+
+    async def get(self, context=None) -> ehr_service_pb2.PatientResponse:
+        request = ehr_service_pb2.GetPatientRequest(patient_uuid=str(PATIENT_UUID))
+        return await self.servicer.GetPatient(request, context or FakeContext())
+
+    async def update(self) -> ehr_service_pb2.PatientResponse:
+        request = ehr_service_pb2.UpdatePatientRequest(patient_uuid=str(PATIENT_UUID))
+        request.updateData.update({'contacts': {'phone': '+358'}})
+        return await self.servicer.UpdatePatient(request, FakeContext())
+
+    async def start_slow_get(self) -> asyncio.Task:
+        """Start a GetPatient whose database read stays open until read_gate is set"""
+        self.read_gate.clear()
+        reads = self.reads
+        task = asyncio.create_task(self.get())
+        while self.reads == reads:
+            await asyncio.sleep(0)
+        return task
+
+    async def test_get_after_update_does_not_join_pre_update_load(self):
+        with mock.patch.object(crud_service, 'get_patient', self.get_patient), \
+                mock.patch.object(crud_service, 'update_patient', self.update_patient):
+            slow_get = await self.start_slow_get()
+            updated = await self.update()
+            fresh = asyncio.create_task(self.get())
+            self.read_gate.set()
+
+            self.assertEqual(updated.patient.version, 2)
+            self.assertEqual((await slow_get).patient.version, 1)
+            self.assertEqual((await fresh).patient.version, 2)
+
+    async def test_get_after_delete_does_not_join_pre_delete_load(self):
+        with mock.patch.object(crud_service, 'get_patient', self.get_patient), \
+                mock.patch.object(crud_service, 'delete_patient', self.delete_patient):
+            slow_get = await self.start_slow_get()
+            request = ehr_service_pb2.DeletePatientRequest(patient_uuid=str(PATIENT_UUID))
+            await self.servicer.DeletePatient(request, FakeContext())
+            context = FakeContext()
+            fresh = asyncio.create_task(self.get(context))
+            self.read_gate.set()
+            await slow_get
+            await fresh
+
+            self.assertEqual(context.code, grpc.StatusCode.NOT_FOUND)
+
+    async def test_concurrent_gets_share_one_load(self):
+        calls = []
+
+        async def get_patient(patient_uuid):
+            calls.append(patient_uuid)
+            return await self.get_patient(patient_uuid)
+
+        with mock.patch.object(crud_service, 'get_patient', get_patient):
+            self.read_gate.clear()
+            tasks = [asyncio.create_task(self.get()) for _ in range(5)]
+            await asyncio.sleep(0)
+            self.read_gate.set()
+            responses = await asyncio.gather(*tasks)
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r.patient.version == 1 for r in responses))
+        self.assertEqual(grpc_server.patient_loads, {})
+
+
+class BulkCreateTest(unittest.IsolatedAsyncioTestCase):
+    """BulkCreatePatients batching, error indexes and partial results"""
+
+    def setUp(self):
+        self.insert_calls = 0
+        self.fail_on_call = None
+
+    def record(self, patient_id: str) -> ehr_service_pb2.CreatePatientRequest:
+        request = ehr_service_pb2.CreatePatientRequest()
+        request.patientData.update({
+            'identity': {'patientId': patient_id},
+            'demographics': {'name': {'given': 'Jane', 'family': 'Doe'}, 'dob': '1984-03-12'},
+            'sourceHospital': 'HOSP-A',
+        })
+        return request
+
+    async def insert_many(self, patients, ordered=True):
+        # Reject every patient whose patientId is DUP, as the unique index would
+        self.insert_calls += 1
+        if self.insert_calls == self.fail_on_call:
+            raise RuntimeError('connection lost')
+        write_errors = [{'index': index, 'code': 11000}
+                        for index, patient in enumerate(patients)
+                        if patient.identity.patientId == 'DUP']
+        if write_errors:
+            raise BulkWriteError({'writeErrors': write_errors})
+
+    async def bulk_create(self, requests) -> ehr_service_pb2.BulkCreatePatientsResponse:
+        async def request_iterator():
+            for request in requests:
+                yield request
+
+        def new_patient(patient):
+            return Patient.model_construct(id=uuid4(), identity=patient.identity)
+
+        with mock.patch.object(crud_service, '_new_patient', new_patient), \
+                mock.patch.object(crud_service.Patient, 'insert_many', self.insert_many):
+            servicer = grpc_server.EhrServiceServicer()
+            return await servicer.BulkCreatePatients(request_iterator(), FakeContext())
+
+    async def test_errors_keep_request_body_indexes(self):
+        requests = [self.record(f'P-{index}') for index in range(70)]
+        requests[10].patientData['demographics'] = 'not an object'
+        requests[66] = self.record('DUP')
+
+        response = await self.bulk_create(requests)
+
+        self.assertEqual(self.insert_calls, 2)
+        self.assertEqual(len(response.patient_uuids), 68)
+        self.assertEqual(len(response.errors), 2)
+        self.assertTrue(response.errors[0].startswith('Record 10: '))
+        self.assertEqual(response.errors[1], "Record 66: Patient with patientId 'DUP' already exists")
+        self.assertEqual(response.error, '')
+
+    async def test_cap_sets_error(self):
+        with mock.patch.object(grpc_server, 'BULK_CREATE_MAX_RECORDS', 3):
+            response = await self.bulk_create([self.record(f'P-{index}') for index in range(5)])
+
+        self.assertEqual(len(response.patient_uuids), 3)
+        self.assertEqual(response.error, 'Too many records; only the first 3 were processed')
+
+    async def test_failure_after_first_batch_keeps_created_uuids(self):
+        self.fail_on_call = 2
+        batch_size = grpc_server.BULK_CREATE_BATCH_SIZE
+
+        response = await self.bulk_create(
+            [self.record(f'P-{index}') for index in range(batch_size + 5)])
+
+        self.assertEqual(len(response.patient_uuids), batch_size)
+        self.assertEqual(response.error, 'Error creating patients: connection lost')
+
+
+if __name__ == '__main__':
+    unittest.main()